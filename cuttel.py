@@ -1,13 +1,35 @@
+import codecs
+import collections
+import functools
+from fractions import Fraction
 import json
 import os
+import re
 import shlex
 import subprocess
+import tempfile
 import threading
 import time
 import hashlib
 import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
 from tkinter import ttk, filedialog, messagebox
 
+try:
+    import xxhash  # optional: faster thumbnail cache keys
+except ImportError:
+    xxhash = None
+
+try:
+    from PIL import Image, ImageTk  # optional: decode preview PNGs off the Tk thread
+except ImportError:
+    Image = ImageTk = None
+
+try:
+    import av  # optional: read clip metadata in-process instead of spawning ffprobe
+except ImportError:
+    av = None
+
 # ----------------------------
 # CUTTEL v1.6  (full single-file)
 # - Remembers settings via cuttel.json (load on start, save on close + on Export)
@@ -21,9 +43,20 @@ from tkinter import ttk, filedialog, messagebox
 
 DROP_LINE_COLOR = "#0b6b3a"  # dark green insertion line
 PREVIEW_DWELL_MS = 400
+MOTION_DEBOUNCE_MS = 30  # tree <Motion> is coalesced to one hit-test per interval
 PREVIEW_OFFSET_PX = 20
 PREVIEW_CLAMP_W = 360  # rough clamp size for keeping popup on-screen
 PREVIEW_CLAMP_H = 240
+VIRTUAL_ROWS = 200  # clip rows put in the Treeview up front; the rest only once scrolled to
+VIRTUAL_CHUNK = 100  # rows attached each time the view is scrolled to the end
+UI_POLL_MS = 50  # how often the Tk thread drains work queued by worker threads
+MAX_LOG_LINES = 5000
+LOG_FLUSH_MS = 50
+PIPE_BUFSIZE = 65536  # ffmpeg stdout/stderr pipe buffer and read chunk size
+PROGRESS_UI_INTERVAL = 0.1  # seconds between progress bar updates while encoding
+PROBE_WORKERS = min(8, os.cpu_count() or 1)
+
+NO_TRANSITION = "none"  # hard cuts: concat instead of xfade (stream copy when clips allow)
 
 XFADE_TRANSITIONS = [
     ("Fade", "fade"),
@@ -37,7 +70,10 @@ XFADE_TRANSITIONS = [
     ("Smooth Right", "smoothright"),
     ("Circle Open", "circleopen"),
     ("Circle Close", "circleclose"),
+    ("No transition (cut)", NO_TRANSITION),
 ]
+XFADE_LABELS = [f"{name}  ({code})" for name, code in XFADE_TRANSITIONS]
+XFADE_CODE_INDEX = {code: idx for idx, (_name, code) in enumerate(XFADE_TRANSITIONS)}
 
 PRESETS = ["ultrafast", "superfast", "veryfast", "faster", "fast", "medium", "slow", "slower", "veryslow"]
 
@@ -49,9 +85,14 @@ CODECS = [
 ]
 
 
+@functools.cache
 def which_or_hint(exe_name: str) -> str:
+    # resolve to an absolute path once, so no spawn has to search PATH again;
+    # fall back to a copy next to this script, then to the bare name
     from shutil import which
-    return which(exe_name) or exe_name
+    here = os.path.dirname(os.path.abspath(__file__))
+    found = which(exe_name) or which(exe_name, path=here)
+    return os.path.abspath(found) if found else exe_name
 
 
 FFMPEG = which_or_hint("ffmpeg")
@@ -59,20 +100,122 @@ FFPROBE = which_or_hint("ffprobe")
 
 SETTINGS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cuttel.json")
 DEFAULT_OUT = os.path.join(os.path.expanduser("~"), "Desktop", "stitched_1080p.mp4")
+PROBE_CACHE_PATH = os.path.expanduser("~/.cuttel_probe_cache.json")
+PROBE_CACHE_MAX = 2000  # most recently probed files kept on disk
+
+
+def _hidden_console_kwargs() -> dict:
+    # Windows: don't allocate/show a console window for every helper ffmpeg/ffprobe
+    if os.name != "nt":
+        return {}
+    si = subprocess.STARTUPINFO()
+    si.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+    si.wShowWindow = subprocess.SW_HIDE
+    return {"creationflags": subprocess.CREATE_NO_WINDOW, "startupinfo": si}
+
+
+SUBPROCESS_KW = _hidden_console_kwargs()
 
 
 def run_cmd_capture(cmd_list):
-    p = subprocess.Popen(cmd_list, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-    out, err = p.communicate()
-    return p.returncode, out, err
+    # explicit UTF-8 instead of the locale codepage (non-ASCII clip names)
+    p = subprocess.run(
+        cmd_list,
+        capture_output=True,
+        encoding="utf-8",
+        errors="replace",
+        check=False,
+        **SUBPROCESS_KW,
+    )
+    return p.returncode, p.stdout, p.stderr
+
+
+def run_cmd_quiet(cmd_list) -> int:
+    # for commands whose output we don't read: no pipes, the OS drops it
+    p = subprocess.run(
+        cmd_list,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        check=False,
+        **SUBPROCESS_KW,
+    )
+    return p.returncode
+
+
+# every field read from a probe anywhere in the app; ffprobe prints nothing else
+FFPROBE_ENTRIES = (
+    "format=duration:"
+    "stream=codec_type,codec_name,profile,duration,width,height,pix_fmt,sample_aspect_ratio,r_frame_rate,time_base,"
+    "sample_rate,channels,channel_layout:"
+    "stream_side_data=rotation:stream_tags=rotate"
+)
+
+
+def _ratio(r, sep="/") -> str | None:
+    return f"{r.numerator}{sep}{r.denominator}" if r else None
+
+
+def _av_stream_info(s) -> dict:
+    # the ffprobe JSON fields of FFPROBE_ENTRIES, with ffprobe's value types
+    d = {"codec_type": s.type}
+    if s.duration is not None and s.time_base:
+        d["duration"] = f"{float(s.duration * s.time_base):.6f}"
+    cc = s.codec_context
+    if cc is None:
+        return d
+    codec = cc.codec
+    d["codec_name"] = getattr(codec, "canonical_name", codec.name)
+    if cc.profile:
+        d["profile"] = cc.profile
+    d["time_base"] = _ratio(s.time_base)
+    if s.type == "video":
+        d.update(width=cc.width, height=cc.height, pix_fmt=cc.pix_fmt,
+                 sample_aspect_ratio=_ratio(cc.sample_aspect_ratio, ":"),
+                 r_frame_rate=_ratio(s.base_rate))
+    elif s.type == "audio":
+        d.update(sample_rate=str(cc.sample_rate), channels=cc.channels,
+                 channel_layout=cc.layout.name if cc.layout else None)
+    return {k: v for k, v in d.items() if v is not None}
+
+
+def _av_rotation(c, s) -> int:
+    # PyAV only exposes the display matrix on decoded frames: decode the first one.
+    # No frame (or a PyAV without frame.rotation) raises, and ffprobe does the probe.
+    for frame in c.decode(s):
+        return int(round(frame.rotation))
+    raise RuntimeError("no decodable video frame")
+
+
+def _av_info(path: str) -> dict:
+    with av.open(path) as c:
+        fmt = {}
+        if c.duration is not None:
+            fmt["duration"] = f"{c.duration / av.time_base:.6f}"
+        streams = [_av_stream_info(s) for s in c.streams]
+        if c.streams.video:
+            # first video stream: the only one whose rotation is read (see _first_stream)
+            vs = c.streams.video[0]
+            d = streams[vs.index]
+            if "rotate" in vs.metadata:
+                d["tags"] = {"rotate": vs.metadata["rotate"]}
+            else:
+                rot = _av_rotation(c, vs)
+                if rot:
+                    d["side_data_list"] = [{"rotation": rot}]
+        return {"format": fmt, "streams": streams}
 
 
 def ffprobe_info(path: str) -> dict:
+    if av is not None:
+        try:
+            return _av_info(path)
+        except Exception:
+            pass  # let ffprobe have a go and report the error
     cmd = [
         FFPROBE, "-v", "error",
         "-print_format", "json",
-        "-show_format",
-        "-show_streams",
+        "-show_entries", FFPROBE_ENTRIES,
         path
     ]
     code, out, err = run_cmd_capture(cmd)
@@ -81,9 +224,7 @@ def ffprobe_info(path: str) -> dict:
     return json.loads(out)
 
 
-def ffprobe_duration_seconds(path: str) -> float:
-    data = ffprobe_info(path)
-
+def info_duration_seconds(data: dict, path: str) -> float:
     fmt = data.get("format") or {}
     dur = None
     if "duration" in fmt and fmt["duration"] not in (None, ""):
@@ -108,25 +249,269 @@ def ffprobe_duration_seconds(path: str) -> float:
     return dur
 
 
-def ffprobe_has_audio(path: str) -> bool:
-    data = ffprobe_info(path)
+def info_has_audio(data: dict) -> bool:
     for s in data.get("streams") or []:
         if (s.get("codec_type") or "").lower() == "audio":
             return True
     return False
 
 
+def info_audio_format(data: dict):
+    # (sample_rate, channel_layout) of the first audio stream, or None
+    for s in data.get("streams") or []:
+        if (s.get("codec_type") or "").lower() == "audio":
+            try:
+                rate = int(s.get("sample_rate") or 0)
+            except ValueError:
+                rate = 0
+            return rate, (s.get("channel_layout") or "")
+    return None
+
+
+def _first_stream(data: dict, codec_type: str) -> dict | None:
+    for s in data.get("streams") or []:
+        if (s.get("codec_type") or "").lower() == codec_type:
+            return s
+    return None
+
+
+def _frame_rate(s: dict) -> Fraction | None:
+    try:
+        return Fraction(s.get("r_frame_rate") or "")
+    except (ValueError, ZeroDivisionError):
+        return None
+
+
+def _rotation(v: dict) -> int:
+    for sd in v.get("side_data_list") or []:
+        if "rotation" in sd:
+            return int(sd["rotation"])
+    try:
+        return int((v.get("tags") or {}).get("rotate") or 0)
+    except ValueError:
+        return 0
+
+
+def video_geometry(data: dict, autorotate=True):
+    # (width, height, sar) of the first video stream as ffmpeg will hand it to the
+    # filter graph, or None when that isn't known. Without autorotate (hwaccel frames)
+    # a rotated clip never reaches the graph upright, so it has no usable geometry.
+    v = _first_stream(data, "video")
+    if not v or not v.get("width") or not v.get("height"):
+        return None
+    w, h = v["width"], v["height"]
+    rot = _rotation(v)
+    if rot % 360 and not autorotate:
+        return None
+    if rot % 180:
+        w, h = h, w
+    try:
+        sar = Fraction((v.get("sample_aspect_ratio") or "1:1").replace(":", "/"))
+    except (ValueError, ZeroDivisionError):
+        sar = Fraction(1)
+    return w, h, sar or Fraction(1)  # 0:1 = unspecified, square
+
+
+# codec_name a copied video stream must have to stand in for each encoder's output
+COPY_VIDEO_CODECS = {"libx264": "h264", "h264_nvenc": "h264", "libx265": "hevc", "hevc_nvenc": "hevc"}
+
+
+def concat_copy_compatible(infos, vcodec="libx264", fps=30, width=1920, height=1080) -> bool:
+    # stream copy is only allowed when the clips (one or many) already are what the
+    # filter graph would produce, and, for the concat demuxer, have identical streams
+    sigs = set()
+    for data in infos:
+        v = _first_stream(data, "video")
+        a = _first_stream(data, "audio")
+        if not v or v.get("codec_name") != COPY_VIDEO_CODECS.get(vcodec):
+            return False  # the chosen codec, and nothing mp4 can't hold
+        if not a or a.get("codec_name") != "aac":
+            return False  # the graph always outputs an aac track (silence if needed)
+        if _rotation(v) % 360:
+            return False  # the graph autorotates + letterboxes; a copy keeps (or, in concat, drops) the matrix
+        if (v.get("width"), v.get("height")) != (width, height) or v.get("pix_fmt") != "yuv420p":
+            return False
+        if v.get("sample_aspect_ratio") not in (None, "1:1", "0:1"):
+            return False
+        if _frame_rate(v) != fps:
+            return False
+        a_sig = (a.get("codec_name"), a.get("sample_rate"), a.get("channels"))
+        sigs.add((v.get("codec_name"), v.get("profile"), v.get("time_base"), a_sig))
+    return len(sigs) == 1
+
+
+def write_concat_list(paths) -> str:
+    # list file for -f concat; a ' inside a path is closed, escaped and reopened
+    fd, list_path = tempfile.mkstemp(prefix="cuttel_", suffix=".txt")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        for pth in paths:
+            esc = pth.replace("'", "'\\''")
+            f.write(f"file '{esc}'\n")
+    return list_path
+
+
+# one ffprobe run, everything the app needs from it (info = the raw ffprobe JSON)
+ProbeResult = collections.namedtuple("ProbeResult", ["duration", "has_audio", "info"])
+
+
+@functools.lru_cache(maxsize=512)
+def _ffprobe_probe_stat(path: str, mtime_ns: int, size: int) -> ProbeResult:
+    # mtime/size are only part of the cache key: a changed file is re-probed
+    info = ffprobe_info(path)
+    return ProbeResult(info_duration_seconds(info, path), info_has_audio(info), info)
+
+
+# on-disk probe cache: path -> [mtime_ns, size, info], tagged with PROBE_CACHE_TAG; shared by worker threads
+_probe_cache_lock = threading.Lock()
+_probe_cache_dirty = False  # entries added since the last save
+# serializes writers (export worker, Tk thread on close/settings) on the one .tmp file
+_probe_cache_save_lock = threading.Lock()
+
+
+# what the on-disk cache entries were made with; any change (fields, PyAV on/off) starts it over
+PROBE_CACHE_TAG = f"{FFPROBE_ENTRIES}|{'pyav' if av is not None else 'ffprobe'}"
+
+
+def load_probe_cache() -> dict:
+    try:
+        with open(PROBE_CACHE_PATH, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if not isinstance(data, dict) or data.get("entries") != PROBE_CACHE_TAG:
+            return {}
+        files = data.get("files")
+        return files if isinstance(files, dict) else {}
+    except Exception:
+        return {}
+
+
+def save_probe_cache(cache: dict):
+    global _probe_cache_dirty
+    tmp = PROBE_CACHE_PATH + ".tmp"
+    with _probe_cache_save_lock:
+        with _probe_cache_lock:
+            if not _probe_cache_dirty:
+                return
+            _probe_cache_dirty = False
+            keep = dict(list(cache.items())[-PROBE_CACHE_MAX:])
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"entries": PROBE_CACHE_TAG, "files": keep}, f, separators=(",", ":"))
+            os.replace(tmp, PROBE_CACHE_PATH)
+        except Exception:
+            with _probe_cache_lock:
+                _probe_cache_dirty = True  # try again on the next save
+
+
+def ffprobe_probe(path: str, cache: dict | None = None) -> ProbeResult:
+    global _probe_cache_dirty
+    st = os.stat(path)
+    if cache is not None:
+        with _probe_cache_lock:
+            hit = cache.get(path)
+        if isinstance(hit, list) and len(hit) == 3 and hit[0] == st.st_mtime_ns and hit[1] == st.st_size:
+            info = hit[2]
+            return ProbeResult(info_duration_seconds(info, path), info_has_audio(info), info)
+
+    res = _ffprobe_probe_stat(path, st.st_mtime_ns, st.st_size)
+    if cache is not None:
+        with _probe_cache_lock:
+            _probe_cache_dirty = True
+            cache.pop(path, None)  # re-insert at the end: newest entries survive the PROBE_CACHE_MAX cut
+            cache[path] = [st.st_mtime_ns, st.st_size, res.info]
+    return res
+
+
+def ffprobe_duration_seconds(path: str) -> float:
+    return ffprobe_probe(path).duration
+
+
+def ffprobe_has_audio(path: str) -> bool:
+    return ffprobe_probe(path).has_audio
+
+
+# x264-style UI preset -> NVENC p1 (fastest) .. p7 (best quality)
+_NVENC_PRESET_MAP = {
+    **dict.fromkeys(("ultrafast", "superfast", "veryfast"), "p1"),
+    "faster": "p2",
+    "fast": "p3",
+    "medium": "p4",
+    "slow": "p5",
+    "slower": "p6",
+    "veryslow": "p7",
+}
+
+
 def map_ui_preset_to_nvenc(ui_preset: str) -> str:
-    slow_group = {"slow", "slower", "veryslow"}
-    medium_group = {"medium"}
-    fast_group = {"ultrafast", "superfast", "veryfast", "faster", "fast"}
-    if ui_preset in slow_group:
-        return "slow"
-    if ui_preset in medium_group:
-        return "medium"
-    if ui_preset in fast_group:
-        return "fast"
-    return "medium"
+    return _NVENC_PRESET_MAP.get(ui_preset, "p4")
+
+
+@functools.lru_cache(maxsize=None)
+def ffmpeg_filters() -> frozenset:
+    # names from `ffmpeg -filters`; empty when ffmpeg can't be run
+    try:
+        code, out, _err = run_cmd_capture([FFMPEG, "-hide_banner", "-filters"])
+    except OSError:
+        return frozenset()
+    if code != 0:
+        return frozenset()
+    names = set()
+    for line in out.splitlines():
+        f = line.split()
+        # " TSC scale_cuda        V->V       GPU accelerated video resizer"
+        if len(f) >= 3 and "->" in f[2]:
+            names.add(f[1])
+    return frozenset(names)
+
+
+CUDA_FILTERS = {"scale_cuda", "overlay_cuda", "hwupload", "hwdownload"}
+
+# one CUDA device shared by the decoders and the filter graph (hwupload/overlay_cuda)
+CUDA_DEVICE_ARGS = ["-init_hw_device", "cuda=cu", "-filter_hw_device", "cu"]
+
+
+# transitions we hand to xfade_cuda; anything else blends on the CPU
+XFADE_CUDA_TRANSITIONS = {"fade"}
+
+
+def cuda_filters_available() -> bool:
+    return CUDA_FILTERS <= ffmpeg_filters()
+
+
+# what NVDEC can hand over as CUDA frames; anything else would arrive as
+# software frames and break the scale_cuda graph, so such exports stay on the CPU path
+NVDEC_CODECS = {"h264", "hevc", "av1", "vp8", "vp9", "mpeg1video", "mpeg2video", "mpeg4", "vc1"}
+NVDEC_PIX_FMTS = {"yuv420p", "yuvj420p", "nv12"}
+NVDEC_10BIT_CODECS = {"hevc", "vp9", "av1"}  # no 10-bit H.264 on NVDEC
+NVDEC_10BIT_PIX_FMTS = {"yuv420p10le", "p010le"}
+
+
+def nvdec_decodable(info: dict) -> bool:
+    v = _first_stream(info, "video")
+    if not v:
+        return False
+    codec, pix_fmt = v.get("codec_name"), v.get("pix_fmt")
+    if codec not in NVDEC_CODECS:
+        return False
+    if pix_fmt not in NVDEC_PIX_FMTS and not (codec in NVDEC_10BIT_CODECS and pix_fmt in NVDEC_10BIT_PIX_FMTS):
+        return False
+    # ffmpeg doesn't autorotate hwaccel frames: rotated clips would come out sideways
+    return _rotation(v) % 360 == 0
+
+
+def cuda_xfade_available(transition_name: str) -> bool:
+    return transition_name in XFADE_CUDA_TRANSITIONS and "xfade_cuda" in ffmpeg_filters()
+
+
+def build_input_hw_args(vcodec: str):
+    # per-input decode args: NVDEC straight into CUDA frames, no copy back to system memory
+    if not vcodec.endswith("_nvenc"):
+        return []
+    return [
+        "-hwaccel", "cuda",
+        "-hwaccel_device", "cu",
+        "-hwaccel_output_format", "cuda",
+        "-extra_hw_frames", "8",
+    ]
 
 
 def build_video_encode_args(vcodec: str, quality: int, ui_preset: str):
@@ -150,60 +535,108 @@ def build_video_encode_args(vcodec: str, quality: int, ui_preset: str):
     return args
 
 
-def build_filter_graph(inputs, durations, has_audio, transition_name, tdur, fps=30, width=1920, height=1080):
+# filter_complex node templates (filled per clip / per transition)
+_VSCALE_TMPL = (
+    "[{i}:v]"
+    "scale={w}:{h}:force_original_aspect_ratio=decrease,"
+    "pad={w}:{h}:(ow-iw)/2:(oh-ih)/2,"
+    "fps={fps},format=yuv420p,setsar=1"
+    "[v{i}]"
+)
+# source already has the target aspect ratio with square pixels: nothing to pad
+_VSCALE_FIT_TMPL = "[{i}:v]scale={w}:{h},fps={fps},format=yuv420p,setsar=1[v{i}]"
+# GPU variant: scale on CUDA and letterbox by overlaying onto a black CUDA canvas.
+# Frames are downloaded once per clip unless the transitions run on CUDA too.
+_VSCALE_CUDA_TMPL = (
+    "[{i}:v]scale_cuda={w}:{h}:force_original_aspect_ratio=decrease:format=yuv420p[s{i}];"
+    "color=c=black:s={w}x{h}:r={fps},format=yuv420p,hwupload[bg{i}];"
+    "[bg{i}][s{i}]overlay_cuda=x=(W-w)/2:y=(H-h)/2:shortest=1,"
+    "fps={fps},setsar=1"
+)
+_VSCALE_CUDA_FIT_TMPL = "[{i}:v]scale_cuda={w}:{h}:format=yuv420p,fps={fps},setsar=1"
+_VSCALE_CUDA_DOWNLOAD = ",hwdownload,format=yuv420p"
+_ARESAMPLE_TMPL = "[{i}:a]aresample=48000[a{i}]"
+_ANULL_TMPL = "[{i}:a]anull[a{i}]"  # already 48 kHz stereo
+# a generator per silent clip: pulled on demand, where a shared asplit would queue
+# every later clip's silence until the graph reaches it
+_ASILENCE_TMPL = "anullsrc=r=48000:cl=stereo,atrim=0:{d},asetpts=N/SR/TB[a{i}]"
+_XFADE_TMPL = "[{prev}][v{j}]xfade=transition={transition}:duration={tdur}:offset={offset}[vx{j}]"
+_XFADE_CUDA_TMPL = "[{prev}][v{j}]xfade_cuda=transition={transition}:duration={tdur}:offset={offset}[vx{j}]"
+_AFADE_TMPL = "[{prev}][a{j}]acrossfade=d={tdur}:c1=tri:c2=tri[ax{j}]"
+
+
+def build_filter_graph(inputs, durations, has_audio, transition_name, tdur, fps=30, width=1920, height=1080,
+                       hw=False, audio_fmts=None, gpu_xfade=False, geometries=None):
     n = len(inputs)
     if n < 1:
         raise ValueError("No inputs")
 
     parts = []
+    # gpu_xfade: frames stay CUDA surfaces up to the encoder (only with hw, n > 1, tdur > 0)
+    gpu_xfade = hw and gpu_xfade and n > 1 and tdur > 0
+    if gpu_xfade:
+        vscale = _VSCALE_CUDA_TMPL + "[v{i}]"
+        vfit = _VSCALE_CUDA_FIT_TMPL + "[v{i}]"
+    elif hw:
+        vscale = _VSCALE_CUDA_TMPL + _VSCALE_CUDA_DOWNLOAD + "[v{i}]"
+        vfit = _VSCALE_CUDA_FIT_TMPL + _VSCALE_CUDA_DOWNLOAD + "[v{i}]"
+    else:
+        vscale = _VSCALE_TMPL
+        vfit = _VSCALE_FIT_TMPL
+    xfade = _XFADE_CUDA_TMPL if gpu_xfade else _XFADE_TMPL
+    # size/fps are the same for every clip: fill them in once, leave only {i} per clip
+    vscale = vscale.format(i="{i}", w=width, h=height, fps=fps)
+    vfit = vfit.format(i="{i}", w=width, h=height, fps=fps)
+
+    def fits(i):
+        # geometries[i] = (w, h, sar) from video_geometry(); unknown clips get letterboxed
+        g = geometries[i] if geometries else None
+        return bool(g) and g[2] == 1 and g[0] * height == g[1] * width
 
     for i in range(n):
-        parts.append(
-            f"[{i}:v]"
-            f"scale={width}:{height}:force_original_aspect_ratio=decrease,"
-            f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2,"
-            f"fps={fps},format=yuv420p,setsar=1"
-            f"[v{i}]"
-        )
-
+        parts.append((vfit if fits(i) else vscale).format(i=i))
         if has_audio[i]:
-            parts.append(f"[{i}:a]aresample=48000[a{i}]")
+            if audio_fmts and audio_fmts[i] == (48000, "stereo"):
+                parts.append(_ANULL_TMPL.format(i=i))
+            else:
+                parts.append(_ARESAMPLE_TMPL.format(i=i))
         else:
-            d = durations[i]
-            parts.append(f"anullsrc=r=48000:cl=stereo,atrim=0:{d},asetpts=N/SR/TB[a{i}]")
+            parts.append(_ASILENCE_TMPL.format(i=i, d=durations[i]))
 
     if n == 1:
         return ";".join(parts), "[v0]", "[a0]"
 
+    if tdur <= 0:
+        # hard cuts: nothing to blend, just join the streams
+        labels = "".join(f"[v{i}][a{i}]" for i in range(n))
+        parts.append(f"{labels}concat=n={n}:v=1:a=1[vcat][acat]")
+        return ";".join(parts), "[vcat]", "[acat]"
+
     v_prev = "v0"
     a_prev = "a0"
+    running = 0.0  # prefix sum of durations[:k+1]
 
     for k in range(n - 1):
-        timeline_len = sum(durations[:k+1]) - (k * tdur)
-        offset = timeline_len - tdur
-        if offset < 0:
-            offset = 0.0
-
-        v_out = f"vx{k+1}"
-        a_out = f"ax{k+1}"
-
-        parts.append(
-            f"[{v_prev}][v{k+1}]"
-            f"xfade=transition={transition_name}:duration={tdur}:offset={offset}"
-            f"[{v_out}]"
-        )
-        parts.append(
-            f"[{a_prev}][a{k+1}]"
-            f"acrossfade=d={tdur}:c1=tri:c2=tri"
-            f"[{a_out}]"
-        )
+        running += durations[k]
+        timeline_len = running - k * tdur  # stitched length through clip k
+        offset = max(0.0, timeline_len - tdur)
 
-        v_prev = v_out
-        a_prev = a_out
+        j = k + 1
+        parts.append(xfade.format(prev=v_prev, j=j, transition=transition_name, tdur=tdur, offset=offset))
+        parts.append(_AFADE_TMPL.format(prev=a_prev, j=j, tdur=tdur))
+
+        v_prev = f"vx{j}"
+        a_prev = f"ax{j}"
 
     return ";".join(parts), f"[{v_prev}]", f"[{a_prev}]"
 
 
+# the ffmpeg -progress keys the UI uses, matched over whole decoded chunks
+_PROGRESS_RE = re.compile(r"^(out_time_ms|speed)=[ \t]*(\S+)", re.M)
+# any "key=value" line of a progress frame; everything else in the merged stream is log
+_PROGRESS_LINE_RE = re.compile(r"\w+=")
+
+
 def fmt_time(sec: float) -> str:
     if sec < 0:
         sec = 0
@@ -216,6 +649,10 @@ def fmt_time(sec: float) -> str:
     return f"{m:d}:{s:02d}"
 
 
+# queued UI calls that block in a modal dialog until the user closes it
+_MODAL_UI = {messagebox.showinfo, messagebox.showwarning, messagebox.showerror}
+
+
 class App(tk.Tk):
     def __init__(self):
         super().__init__()
@@ -228,13 +665,33 @@ class App(tk.Tk):
         self.cancel_requested = threading.Event()
         self.total_out_seconds = 0.0
 
-        # iid -> dict(path, dur, has_audio)
+        # log lines are buffered and written to the Text widget in batches
+        self._log_buffer: list[str] = []
+        self._log_flush_scheduled = False
+
+        # (fn, args) posted by worker threads via ui(); drained on the Tk thread
+        self._ui_queue = collections.deque()
+
+        # iid -> dict(path, dur, has_audio, probed[, thumb_path])
         self.items = {}
         self._iid_counter = 1
 
+        # canonical clip order; the tree only has rows for the first _attach_limit entries
+        self._display_order: list[str] = []
+        self._attach_limit = VIRTUAL_ROWS
+        self._grow_pending = False
+
+        # background ffprobe jobs (one task per clip)
+        self._probe_pool = ThreadPoolExecutor(max_workers=PROBE_WORKERS)
+        self._probe_cache = load_probe_cache()  # survives restarts, see PROBE_CACHE_PATH
+
         # thumbnail cache (hover preview only)
         self.thumb_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cuttel_thumbs")
         os.makedirs(self.thumb_dir, exist_ok=True)
+        self._thumbs_present = set(os.listdir(self.thumb_dir))  # file names, read once
+        self._thumb_inflight: set[str] = set()  # out_png paths being generated
+        self._thumb_lock = threading.Condition()
+        self._thumb_hwaccel = False  # NVDEC thumbnails, only while an NVENC codec is picked
 
         # hover preview state
         self._hover_after_id = None
@@ -242,6 +699,8 @@ class App(tk.Tk):
         self._preview_win = None
         self._preview_label = None
         self._preview_photo = None  # keep ref
+        self._motion_pending = None  # last event.y not yet hit-tested
+        self._motion_after_id = None
 
         # drag & drop state
         self._drag_iid = None
@@ -252,8 +711,10 @@ class App(tk.Tk):
 
         self._build_ui()
         self._apply_settings(self._settings)
+        self._sync_thumb_hwaccel()
 
         self.protocol("WM_DELETE_WINDOW", self._on_close)
+        self.after(UI_POLL_MS, self._drain_ui)
 
     # ---------------- settings ----------------
     def _load_settings(self) -> dict:
@@ -301,11 +762,16 @@ class App(tk.Tk):
         }
 
     def _save_settings(self):
+        # compact JSON to a temp file, then an atomic swap: never a half-written cuttel.json
+        tmp = SETTINGS_PATH + ".tmp"
         try:
-            with open(SETTINGS_PATH, "w", encoding="utf-8") as f:
-                json.dump(self._collect_settings(), f, indent=2)
+            data = json.dumps(self._collect_settings(), separators=(",", ":"))
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(data)
+            os.replace(tmp, SETTINGS_PATH)
         except Exception:
             pass  # no drama
+        save_probe_cache(self._probe_cache)
 
     def _apply_settings(self, s: dict):
         # codec
@@ -339,13 +805,12 @@ class App(tk.Tk):
         tr = s.get("transition")
         if isinstance(tr, str) and tr:
             self.transition_var.set(tr)
-            for idx, (_name, code) in enumerate(XFADE_TRANSITIONS):
-                if code == tr:
-                    try:
-                        self.transition_menu.current(idx)
-                    except Exception:
-                        pass
-                    break
+            idx = XFADE_CODE_INDEX.get(tr)
+            if idx is not None:
+                try:
+                    self.transition_menu.current(idx)
+                except Exception:
+                    pass
 
         if "tdur" in s:
             try:
@@ -360,6 +825,7 @@ class App(tk.Tk):
 
     def _on_close(self):
         self._save_settings()
+        self._probe_pool.shutdown(wait=False, cancel_futures=True)
         self.destroy()
 
     # ---------------- UI ----------------
@@ -390,7 +856,7 @@ class App(tk.Tk):
 
         self.tree_scroll = ttk.Scrollbar(self.tree_frame, orient="vertical", command=self.tree.yview)
         self.tree_scroll.pack(side="right", fill="y")
-        self.tree.configure(yscrollcommand=self.tree_scroll.set)
+        self.tree.configure(yscrollcommand=self._on_tree_yscroll)
 
         # Drop line indicator
         self.drop_line = tk.Frame(self.tree, height=3, bg=DROP_LINE_COLOR)
@@ -424,7 +890,7 @@ class App(tk.Tk):
         ttk.Label(mid, text="Transition:").grid(row=row, column=0, sticky="w")
         self.transition_var = tk.StringVar(value=XFADE_TRANSITIONS[0][1])
         self.transition_menu = ttk.Combobox(
-            mid, values=[f"{name}  ({code})" for name, code in XFADE_TRANSITIONS], state="readonly"
+            mid, values=XFADE_LABELS, state="readonly"
         )
         self.transition_menu.current(0)
         self.transition_menu.grid(row=row, column=1, sticky="we", padx=8)
@@ -458,6 +924,7 @@ class App(tk.Tk):
                 self.quality_var.set(28)
             if vcodec in ("libx264", "h264_nvenc") and q == 28:
                 self.quality_var.set(23)
+            self._sync_thumb_hwaccel()
 
         self.codec_menu.bind("<<ComboboxSelected>>", on_codec_pick)
 
@@ -537,6 +1004,7 @@ class App(tk.Tk):
 
     # ---------------- log helpers ----------------
     def clear_log(self):
+        self._log_buffer.clear()
         self.log.delete("1.0", "end")
 
     def _on_mousewheel(self, event):
@@ -544,10 +1012,53 @@ class App(tk.Tk):
         self.log.yview_scroll(lines, "units")
 
     def ui(self, fn, *args):
-        self.after(0, lambda: fn(*args))
+        # safe from any thread: no Tk call here, _drain_ui runs it on the Tk thread
+        self._ui_queue.append((fn, args))
+
+    def _drain_ui(self):
+        try:
+            batch = []
+            q = self._ui_queue
+            while q:
+                batch.append(q.popleft())
+            # only the newest progress update of a batch is worth drawing
+            last_progress = -1
+            for k, (fn, _args) in enumerate(batch):
+                if fn == self.set_progress:
+                    last_progress = k
+            for k, (fn, args) in enumerate(batch):
+                if fn == self.set_progress and k != last_progress:
+                    continue
+                if fn in _MODAL_UI:
+                    # a dialog runs its own event loop: outside the poller, later updates keep flowing
+                    self.after_idle(fn, *args)
+                    continue
+                try:
+                    fn(*args)
+                except Exception as e:
+                    self.report_callback_exception(type(e), e, e.__traceback__)
+            if self._log_buffer:
+                self._flush_log()  # all lines of this batch in one insert
+        finally:
+            self.after(UI_POLL_MS, self._drain_ui)
 
     def log_line(self, s: str):
-        self.log.insert("end", s.rstrip() + "\n")
+        self.log_line_batch([s])
+
+    def log_line_batch(self, lines):
+        self._log_buffer.extend(s.rstrip() + "\n" for s in lines)
+        if not self._log_flush_scheduled:
+            self._log_flush_scheduled = True
+            self.after(LOG_FLUSH_MS, self._flush_log)
+
+    def _flush_log(self):
+        self._log_flush_scheduled = False
+        if not self._log_buffer:
+            return
+        buf = self._log_buffer
+        self._log_buffer = []
+        self.log.insert("end", "".join(buf))
+        self.log.delete("1.0", f"end-{MAX_LOG_LINES}l linestart")
         self.log.see("end")
 
     def set_progress(self, cur_sec: float, total_sec: float, speed: str = ""):
@@ -573,16 +1084,81 @@ class App(tk.Tk):
     def _thumb_key(self, path: str) -> str:
         st = os.stat(path)
         raw = f"{path}|{st.st_size}|{st.st_mtime_ns}".encode("utf-8", errors="ignore")
-        return hashlib.md5(raw).hexdigest()
+        if xxhash is not None:
+            return xxhash.xxh3_64(raw).hexdigest()
+        return hashlib.blake2b(raw, digest_size=16).hexdigest()
 
     def _thumb_path(self, path: str) -> str:
         return os.path.join(self.thumb_dir, self._thumb_key(path) + ".png")
 
-    def _ensure_thumb(self, path: str) -> str | None:
-        out_png = self._thumb_path(path)
-        if os.path.exists(out_png):
+    def _ensure_thumb(self, path: str, out_png: str | None = None) -> str | None:
+        if out_png is None:
+            out_png = self._thumb_path(path)
+
+        name = os.path.basename(out_png)
+        if name in self._thumbs_present:
             return out_png
 
+        # prefetch and hover may race for the same clip: let one ffmpeg run, the other waits for it
+        with self._thumb_lock:
+            while out_png in self._thumb_inflight:
+                self._thumb_lock.wait()
+            if name in self._thumbs_present:
+                return out_png
+            self._thumb_inflight.add(out_png)
+
+        try:
+            made = self._make_thumb(path, out_png)
+            if made:
+                self._thumbs_present.add(name)
+            return made
+        finally:
+            with self._thumb_lock:
+                self._thumb_inflight.discard(out_png)
+                self._thumb_lock.notify_all()
+
+    def _drop_thumb(self, out_png: str):
+        # a cached PNG that is gone or won't decode: forget it so _ensure_thumb makes it again
+        self._thumbs_present.discard(os.path.basename(out_png))
+        try:
+            os.remove(out_png)
+        except OSError:
+            pass
+
+    def _sync_thumb_hwaccel(self):
+        idx = self.codec_menu.current()
+        self._thumb_hwaccel = idx >= 0 and CODECS[idx][1].endswith("_nvenc")
+
+    def _thumb_on_gpu(self, path: str) -> bool:
+        # per clip: NVDEC must decode it, and a rotated clip would stay sideways (no autorotate on CUDA frames)
+        if not self._thumb_hwaccel or "scale_cuda" not in ffmpeg_filters():
+            return False
+        try:
+            return nvdec_decodable(ffprobe_probe(path, self._probe_cache).info)
+        except Exception:
+            return False
+
+    def _make_thumb(self, path: str, out_png: str) -> str | None:
+        if self._thumb_on_gpu(path):
+            # decode + scale on the GPU, download only the 320px frame
+            cmd = [
+                FFMPEG, "-y",
+                "-hwaccel", "cuda",
+                "-hwaccel_output_format", "cuda",
+                "-ss", "0.2",
+                "-i", path,
+                "-frames:v", "1",
+                "-vf", "scale_cuda=320:-2:format=yuv420p,hwdownload,format=yuv420p",
+                "-f", "image2",
+                out_png
+            ]
+            code = run_cmd_quiet(cmd)
+            if code == 0 and os.path.exists(out_png):
+                return out_png
+            # a clip NVDEC should handle failed: no usable CUDA decode here at all,
+            # don't pay for the failed attempt on every clip
+            self._thumb_hwaccel = False
+
         cmd = [
             FFMPEG, "-y",
             "-ss", "0.2",
@@ -592,11 +1168,69 @@ class App(tk.Tk):
             "-f", "image2",
             out_png
         ]
-        code, _out, _err = run_cmd_capture(cmd)
+        code = run_cmd_quiet(cmd)
         if code != 0 or not os.path.exists(out_png):
             return None
         return out_png
 
+    # ---------------- tree virtualization ----------------
+    def _on_tree_yscroll(self, first, last):
+        self.tree_scroll.set(first, last)
+        # view reached the last attached row -> attach the next chunk
+        if float(last) >= 1.0 and len(self._display_order) > self._attach_limit and not self._grow_pending:
+            self._grow_pending = True
+            self.after_idle(self._grow_window)
+
+    def _grow_window(self):
+        self._grow_pending = False
+        self._attach_limit += VIRTUAL_CHUNK
+        self._fill_window()
+
+    def _row_values(self, item: dict):
+        if not item.get("probed"):
+            return ("…", "…")
+        d = item["dur"]
+        a = item["has_audio"]
+        return (fmt_time(d) if d is not None else "?", "yes" if a else "no" if a is not None else "?")
+
+    def _place_row(self, iid: str, index):
+        # rows are only created in the tree once they first enter the window
+        if self.tree.exists(iid):
+            self.tree.move(iid, "", index)
+        else:
+            item = self.items[iid]
+            self.tree.insert("", index, iid=iid, text=os.path.basename(item["path"]), values=self._row_values(item))
+
+    def _fill_window(self):
+        # attached rows are always a prefix of _display_order; extend it up to _attach_limit
+        attached = len(self.tree.get_children(""))
+        for iid in self._display_order[attached:self._attach_limit]:
+            self._place_row(iid, "end")
+
+    def _sync_tree_order(self, new_order: list[str]):
+        self._display_order = new_order
+        for idx, iid in enumerate(new_order[:self._attach_limit]):
+            self._place_row(iid, idx)
+        # rows pushed out of the window end up after it; drop them, _place_row recreates them
+        extra = self.tree.get_children("")[self._attach_limit:]
+        if extra:
+            self.tree.delete(*extra)
+
+    def _move_block(self, new_order: list[str], block: list[str], old_start: int, new_start: int):
+        # only the block is repositioned; Tk shifts the rows it jumps over on its own
+        attached = len(self.tree.get_children(""))
+        if max(old_start, new_start) + len(block) > attached:
+            self._sync_tree_order(new_order)
+            return
+        self._display_order = new_order
+        # tree.move indexes the list with the item already taken out, so a block
+        # moving down is placed bottom-up to keep its earlier rows from shifting the target
+        placed = list(enumerate(block))
+        if new_start > old_start:
+            placed.reverse()
+        for j, iid in placed:
+            self.tree.move(iid, "", new_start + j)
+
     # ---------------- hover preview popup ----------------
     def _preview_hide(self):
         if self._hover_after_id:
@@ -639,17 +1273,43 @@ class App(tk.Tk):
         self._preview_label.configure(image=photo, text="")
         self._preview_label.image = photo
 
-    def _preview_load_async(self, iid: str, path: str):
-        def worker():
-            thumb_file = self._ensure_thumb(path)
+    def _preview_finalize(self, iid: str, img, path: str | None = None, retry: bool = False):
+        # runs on the Tk thread: Tk images must not be created from workers
+        if self._hover_iid != iid:
+            return
+        try:
+            if isinstance(img, str):
+                photo = tk.PhotoImage(file=img)
+            else:
+                photo = ImageTk.PhotoImage(img)
+        except Exception:
+            if isinstance(img, str):
+                self._drop_thumb(img)
+                if retry and path:
+                    self._preview_load_async(iid, path, img, retry=False)
+            return
+        self._preview_update_image(iid, photo)
+
+    def _preview_load_async(self, iid: str, path: str, thumb_path: str | None = None, retry: bool = True):
+        def worker(retry):
+            thumb_file = self._ensure_thumb(path, thumb_path)
             if not thumb_file:
                 return
+            if Image is None:
+                # no Pillow: let Tk decode the file on the main thread
+                self.ui(self._preview_finalize, iid, thumb_file, path, retry)
+                return
             try:
-                photo = tk.PhotoImage(file=thumb_file)
+                img = Image.open(thumb_file)
+                img.load()
             except Exception:
+                # deleted or truncated since it was cached: make it once more
+                self._drop_thumb(thumb_file)
+                if retry:
+                    worker(False)
                 return
-            self.ui(self._preview_update_image, iid, photo)
-        threading.Thread(target=worker, daemon=True).start()
+            self.ui(self._preview_finalize, iid, img)
+        threading.Thread(target=worker, args=(retry,), daemon=True).start()
 
     def _clamp_preview_pos(self, x_root: int, y_root: int) -> tuple[int, int]:
         sw = self.winfo_screenwidth()
@@ -669,7 +1329,27 @@ class App(tk.Tk):
             self._preview_hide()
             return
 
-        iid = self.tree.identify_row(event.y)
+        self._motion_pending = event.y
+        if self._motion_after_id is None:
+            self._motion_after_id = self.after(MOTION_DEBOUNCE_MS, self._process_motion)
+
+    def _cancel_pending_motion(self):
+        self._motion_pending = None
+        if self._motion_after_id:
+            try:
+                self.after_cancel(self._motion_after_id)
+            except Exception:
+                pass
+            self._motion_after_id = None
+
+    def _process_motion(self):
+        self._motion_after_id = None
+        y = self._motion_pending
+        self._motion_pending = None
+        if y is None or self._drag_iid is not None:
+            return
+
+        iid = self.tree.identify_row(y)
         if not iid:
             self._preview_hide()
             return
@@ -693,11 +1373,12 @@ class App(tk.Tk):
             if not item:
                 return
             self._preview_show_loading(iid, x_root, y_root)
-            self._preview_load_async(iid, item["path"])
+            self._preview_load_async(iid, item["path"], item.get("thumb_path"))
 
         self._hover_after_id = self.after(PREVIEW_DWELL_MS, show)
 
     def _on_tree_leave(self, _event):
+        self._cancel_pending_motion()
         self._preview_hide()
         self._drop_line_hide()
 
@@ -737,13 +1418,15 @@ class App(tk.Tk):
         self._drag_iid = iid
         self._preview_hide()
 
-    def _contiguous_in_current_order(self, iids: list[str]) -> bool:
-        children = list(self.tree.get_children(""))
-        idxs = [children.index(i) for i in iids if i in children]
+    def _contiguous_span(self, iids: list[str], pos: dict) -> tuple[int, int] | None:
+        # (start, end) of iids in the order pos was built from, None unless they form one block
+        idxs = [pos[i] for i in iids if i in pos]
         if not idxs:
-            return False
+            return None
         idxs_sorted = sorted(idxs)
-        return idxs_sorted == list(range(idxs_sorted[0], idxs_sorted[0] + len(idxs_sorted)))
+        if idxs_sorted != list(range(idxs_sorted[0], idxs_sorted[0] + len(idxs_sorted))):
+            return None
+        return idxs_sorted[0], idxs_sorted[-1]
 
     def _on_tree_drag(self, event):
         if not self._drag_iid:
@@ -768,15 +1451,22 @@ class App(tk.Tk):
             self._drag_iid = None
             return
 
-        children = list(self.tree.get_children(""))
+        children = self._display_order
+        order_pos = {iid: k for k, iid in enumerate(children)}
 
         sel = list(self.tree.selection())
-        if self._drag_iid in sel and len(sel) > 1 and self._contiguous_in_current_order(sel):
-            block = [c for c in children if c in sel]
+        span = None
+        if self._drag_iid in sel and len(sel) > 1:
+            span = self._contiguous_span(sel, order_pos)
+        if span:
+            start = span[0]
+            block = children[start:span[1] + 1]
         else:
+            start = order_pos[self._drag_iid]
             block = [self._drag_iid]
+        block_set = set(block)
 
-        if drop_iid in block:
+        if drop_iid in block_set:
             self._drag_iid = None
             return
 
@@ -787,20 +1477,16 @@ class App(tk.Tk):
             if event.y > y + (h / 2):
                 insert_after = True
 
-        base = [c for c in children if c not in block]
+        base = [c for c in children if c not in block_set]
 
-        try:
-            drop_index = base.index(drop_iid)
-        except ValueError:
-            drop_index = len(base)
+        pos = {iid: k for k, iid in enumerate(base)}
+        drop_index = pos.get(drop_iid, len(base))
 
         if insert_after:
             drop_index += 1
 
         new_order = base[:drop_index] + block + base[drop_index:]
-
-        for idx, iid in enumerate(new_order):
-            self.tree.move(iid, "", idx)
+        self._move_block(new_order, block, start, drop_index)
 
         self.tree.selection_set(block)
         self.tree.focus(block[0])
@@ -850,11 +1536,14 @@ class App(tk.Tk):
             iid = f"c{self._iid_counter}"
             self._iid_counter += 1
 
-            base = os.path.basename(p)
-            self.items[iid] = {"path": p, "dur": None, "has_audio": None}
-            self.tree.insert("", "end", iid=iid, text=base, values=("…", "…"))
+            self.items[iid] = {"path": p, "dur": None, "has_audio": None, "probed": False}
+            self._display_order.append(iid)
             new_iids.append(iid)
 
+        # only rows inside the window become tree items now; the rest once scrolled to
+        if new_iids:
+            self._fill_window()
+
         # Default output path to the folder we selected clips from (first import batch)
         if was_empty and len(self.items) > 0 and self._should_autoset_output_on_first_import():
             self._set_default_output_folder_from_path(paths[0])
@@ -864,31 +1553,37 @@ class App(tk.Tk):
             self._start_background_probe(new_iids)
 
     def _start_background_probe(self, iids):
-        def worker():
-            for iid in iids:
-                item = self.items.get(iid)
-                if not item:
-                    continue
-                path = item["path"]
-                try:
-                    d = ffprobe_duration_seconds(path)
-                    a = ffprobe_has_audio(path)
-                except Exception:
-                    d = None
-                    a = None
-
-                def apply():
-                    cur = self.items.get(iid)
-                    if not cur:
-                        return
-                    cur["dur"] = d
-                    cur["has_audio"] = a
-                    self.tree.set(iid, "duration", fmt_time(d) if d is not None else "?")
-                    self.tree.set(iid, "audio", "yes" if a else "no" if a is not None else "?")
-
-                self.ui(apply)
+        def probe(iid):
+            item = self.items.get(iid)
+            if not item:
+                return
+            path = item["path"]
+            try:
+                d, a, _info = ffprobe_probe(path, self._probe_cache)
+                thumb = self._thumb_path(path)  # stat + hash once here, not on every hover
+            except Exception:
+                d = None
+                a = None
+                thumb = None
+            self.ui(apply, iid, d, a, thumb)
+            if d is not None:
+                # warm the hover-preview thumbnail while the user is still arranging clips
+                self._probe_pool.submit(self._ensure_thumb, path, thumb)
+
+        def apply(iid, d, a, thumb):
+            cur = self.items.get(iid)
+            if not cur:
+                return
+            cur["dur"] = d
+            cur["has_audio"] = a
+            cur["probed"] = True
+            if thumb:
+                cur["thumb_path"] = thumb
+            if self.tree.exists(iid):
+                self.tree.item(iid, values=self._row_values(cur))
 
-        threading.Thread(target=worker, daemon=True).start()
+        for iid in iids:
+            self._probe_pool.submit(probe, iid)
 
     def remove_selected(self):
         sel = list(self.tree.selection())
@@ -897,22 +1592,30 @@ class App(tk.Tk):
         self._preview_hide()
         for iid in sel:
             self.items.pop(iid, None)
-            self.tree.delete(iid)
+        self.tree.delete(*sel)
+        sel_set = set(sel)
+        self._display_order = [c for c in self._display_order if c not in sel_set]
+        self._fill_window()
 
     def clear_all(self):
         self._preview_hide()
         self._drop_line_hide()
-        for iid in list(self.items.keys()):
-            self.tree.delete(iid)
+        # the tree only holds the attached window, so one delete clears it
+        children = self.tree.get_children("")
+        if children:
+            self.tree.delete(*children)
         self.items.clear()
+        self._display_order = []
+        self._attach_limit = VIRTUAL_ROWS
 
     def move_selected(self, direction: int):
         sel = list(self.tree.selection())
         if not sel:
             return
 
-        children = list(self.tree.get_children(""))
-        idxs = [children.index(i) for i in sel if i in children]
+        children = self._display_order
+        pos = {iid: k for k, iid in enumerate(children)}
+        idxs = [pos[i] for i in sel if i in pos]
         if not idxs:
             return
 
@@ -929,17 +1632,12 @@ class App(tk.Tk):
             return
 
         block = children[start:end + 1]
-        base = [c for c in children if c not in block]
-        base.insert(new_start, "__BLOCK__")
-        new_order = []
-        for c in base:
-            if c == "__BLOCK__":
-                new_order.extend(block)
-            else:
-                new_order.append(c)
+        remainder = children[:start] + children[end + 1:]
+        new_order = remainder[:new_start] + block + remainder[new_start:]
 
-        for idx, iid in enumerate(new_order):
-            self.tree.move(iid, "", idx)
+        # keep the moved block inside the attached window
+        self._attach_limit = max(self._attach_limit, new_end + 1)
+        self._move_block(new_order, block, start, new_start)
 
         self.tree.selection_set(block)
         self.tree.focus(block[0])
@@ -961,7 +1659,7 @@ class App(tk.Tk):
         if p and p.poll() is None:
             try:
                 if p.stdin:
-                    p.stdin.write("q\n")
+                    p.stdin.write(b"q\n")
                     p.stdin.flush()
             except Exception:
                 pass
@@ -970,7 +1668,7 @@ class App(tk.Tk):
     # ---------------- export ----------------
     def _ordered_paths(self):
         paths = []
-        for iid in self.tree.get_children(""):
+        for iid in self._display_order:
             item = self.items.get(iid)
             if item:
                 paths.append(item["path"])
@@ -989,7 +1687,7 @@ class App(tk.Tk):
 
         try:
             tdur = float(self.tdur_var.get().strip())
-            if tdur <= 0 or tdur > 5:
+            if tdur < 0 or tdur > 5:
                 raise ValueError()
         except ValueError:
             messagebox.showwarning("Bad transition duration", "Transition duration must be a number between 0 and 5.")
@@ -1003,6 +1701,8 @@ class App(tk.Tk):
         preset = self.preset_var.get()
         abitrate = int(self.abitrate_var.get())
         transition = self.transition_var.get()
+        if transition == NO_TRANSITION:
+            tdur = 0.0
 
         idx = self.codec_menu.current()
         vcodec = CODECS[idx][1] if idx >= 0 else "libx264"
@@ -1015,27 +1715,42 @@ class App(tk.Tk):
         self._preview_hide()
         self._drop_line_hide()
         self.set_busy_state(True)
-        self.log.delete("1.0", "end")
+        self.clear_log()
         self.log_line("----")
         self.log_line("Starting…")
         self.log_line(f"Codec: {vcodec} | Quality(CRF/CQ): {quality} | Preset: {preset} | FPS: {fps}")
+        hw_wanted = vcodec.endswith("_nvenc")
 
         def worker():
+            list_file = None
             try:
                 durations = []
                 has_audio = []
+                audio_fmts = []
+                infos = []
 
                 self.ui(self.set_status_text, "Probing clips…")
 
-                for pth in paths:
+                def probe_one(pth):
                     if self.cancel_requested.is_set():
                         raise RuntimeError("Cancelled.")
-                    self.ui(self.log_line, f"ffprobe: {pth}")
-                    d = ffprobe_duration_seconds(pth)
-                    a = ffprobe_has_audio(pth)
+                    res = ffprobe_probe(pth, self._probe_cache)
+                    # one log call per clip keeps its two lines together when probes finish out of order
+                    self.ui(
+                        self.log_line,
+                        f"ffprobe: {pth}\n"
+                        f"  duration: {res.duration:.3f}s | audio: {'yes' if res.has_audio else 'NO (silence will be added)'}"
+                    )
+                    return res
+
+                with ThreadPoolExecutor(max_workers=min(PROBE_WORKERS, len(paths))) as pool:
+                    probes = list(pool.map(probe_one, paths))  # input order, first error re-raised
+
+                for d, a, info in probes:
                     durations.append(d)
                     has_audio.append(a)
-                    self.ui(self.log_line, f"  duration: {d:.3f}s | audio: {'yes' if a else 'NO (silence will be added)'}")
+                    audio_fmts.append(info_audio_format(info))
+                    infos.append(info)
 
                 n = len(durations)
                 out_total = sum(durations) - max(0, (n - 1)) * tdur
@@ -1045,124 +1760,184 @@ class App(tk.Tk):
 
                 self.ui(self.set_progress, 0.0, self.total_out_seconds, "")
 
-                self.ui(self.set_status_text, "Building ffmpeg graph…")
-                filt, vmap, amap = build_filter_graph(
-                    paths, durations, has_audio, transition, tdur, fps=fps, width=1920, height=1080
-                )
-
-                cmd = [FFMPEG, "-y"]
-                for pth in paths:
-                    cmd += ["-i", pth]
-
-                cmd += [
-                    "-filter_complex", filt,
-                    "-map", vmap,
-                    "-map", amap,
-                ]
-
-                cmd += build_video_encode_args(vcodec, quality, preset)
-
-                cmd += [
-                    "-pix_fmt", "yuv420p",
-                    "-movflags", "+faststart",
-                    "-c:a", "aac",
-                    "-b:a", f"{abitrate}k",
-                    "-progress", "pipe:1",
-                    "-nostats",
-                    out_path
-                ]
-
-                pretty = " ".join(shlex.quote(x) for x in cmd)
-                self.ui(self.log_line, "")
-                self.ui(self.log_line, "FFmpeg command:")
-                self.ui(self.log_line, pretty)
-                self.ui(self.log_line, "")
-
-                self.ui(self.set_status_text, "Encoding…")
-
-                p = subprocess.Popen(
-                    cmd,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    stdin=subprocess.PIPE,
-                    text=True,
-                    bufsize=1,
-                    universal_newlines=True,
-                )
-                self.proc = p
-
-                def read_stderr():
-                    try:
-                        for line in p.stderr:
-                            if self.cancel_requested.is_set():
-                                break
-                            s = line.rstrip()
-                            if s:
-                                self.ui(self.log_line, s)
-                    except Exception:
-                        pass
-
-                t_err = threading.Thread(target=read_stderr, daemon=True)
-                t_err.start()
-
-                cur_sec = 0.0
-                speed = ""
-                last_ui = 0.0
+                def graph_cmd(hw):
+                    gpu_xfade = hw and n > 1 and tdur > 0 and cuda_xfade_available(transition)
+                    if hw:
+                        self.ui(self.log_line, f"GPU transitions: {'yes' if gpu_xfade else 'no (CPU xfade)'}")
+                    filt, vmap, amap = build_filter_graph(
+                        paths, durations, has_audio, transition, tdur, fps=fps, width=1920, height=1080, hw=hw,
+                        audio_fmts=audio_fmts, gpu_xfade=gpu_xfade,
+                        geometries=[video_geometry(info, autorotate=not hw) for info in infos]
+                    )
+
+                    cmd = [FFMPEG, "-y"]
+                    in_args = []
+                    if hw:
+                        cmd += CUDA_DEVICE_ARGS
+                        in_args = build_input_hw_args(vcodec)
+                    for pth in paths:
+                        cmd += in_args + ["-i", pth]
+
+                    cmd += [
+                        "-filter_complex", filt,
+                        "-map", vmap,
+                        "-map", amap,
+                    ]
+
+                    cmd += build_video_encode_args(vcodec, quality, preset)
+
+                    if not gpu_xfade:
+                        # with gpu_xfade NVENC takes the yuv420p CUDA frames as they are
+                        cmd += ["-pix_fmt", "yuv420p"]
+
+                    cmd += [
+                        "-movflags", "+faststart",
+                        "-c:a", "aac",
+                        "-b:a", f"{abitrate}k",
+                        "-progress", "pipe:1",
+                        "-nostats",
+                        out_path
+                    ]
+                    return cmd
+
+                def run_ffmpeg(cmd):
+                    pretty = " ".join(shlex.quote(x) for x in cmd)
+                    self.ui(self.log_line, "")
+                    self.ui(self.log_line, "FFmpeg command:")
+                    self.ui(self.log_line, pretty)
+                    self.ui(self.log_line, "")
 
-                for line in p.stdout:
-                    if self.cancel_requested.is_set():
-                        break
-                    line = line.strip()
-                    if not line:
-                        continue
-                    if "=" in line:
-                        k, v = line.split("=", 1)
-                        k = k.strip()
-                        v = v.strip()
-
-                        if k == "out_time_ms":
-                            try:
-                                cur_sec = float(v) / 1_000_000.0
-                            except ValueError:
-                                pass
-                        elif k == "out_time":
-                            try:
-                                parts = v.split(":")
-                                if len(parts) == 3:
-                                    hh = int(parts[0])
-                                    mm = int(parts[1])
-                                    ss = float(parts[2])
-                                    cur_sec = hh * 3600 + mm * 60 + ss
-                            except Exception:
-                                pass
-                        elif k == "speed":
+                    self.ui(self.set_status_text, "Encoding…")
+
+                    p = subprocess.Popen(
+                        cmd,
+                        stdout=subprocess.PIPE,
+                        stderr=subprocess.STDOUT,  # one pipe, one reader: Windows can't select() on pipes
+                        stdin=subprocess.PIPE,
+                        bufsize=PIPE_BUFSIZE,
+                    )
+                    self.proc = p
+
+                    cur_sec = 0.0
+                    speed = ""
+                    last_ui = 0.0
+
+                    # progress frames and log lines share the pipe; whatever one read returns is
+                    # decoded once, scanned for progress and the rest goes to the UI as a single batch
+                    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+                    pending = ""
+
+                    while not self.cancel_requested.is_set():
+                        chunk = p.stdout.read1(PIPE_BUFSIZE)
+                        if not chunk:
+                            break
+                        # complete lines only; the partial tail is completed by the next chunk
+                        head, _sep, pending = (pending + decoder.decode(chunk)).rpartition("\n")
+                        latest = dict(_PROGRESS_RE.findall(head))  # later frames overwrite earlier ones
+                        v = latest.get("out_time_ms")
+                        if v is not None and v.isdigit():  # "N/A" before the first frame
+                            cur_sec = int(v) / 1_000_000.0
+                        v = latest.get("speed")
+                        if v is not None:
                             speed = v
 
+                        lines = [ln.rstrip("\r") for ln in head.split("\n")
+                                 if ln.strip() and not _PROGRESS_LINE_RE.match(ln)]
+                        if lines:
+                            self.ui(self.log_line_batch, lines)
+
+                        # only the latest values of the chunk reach the UI
                         now = time.time()
-                        if now - last_ui > 0.15:
+                        if now - last_ui >= PROGRESS_UI_INTERVAL:
                             last_ui = now
                             self.ui(self.set_progress, cur_sec, self.total_out_seconds, speed)
-                    else:
-                        self.ui(self.log_line, line)
 
-                if self.cancel_requested.is_set():
-                    try:
-                        if p.poll() is None:
-                            p.terminate()
-                            try:
-                                p.wait(timeout=2)
-                            except subprocess.TimeoutExpired:
-                                p.kill()
-                    except Exception:
-                        pass
-                    raise RuntimeError("Cancelled.")
+                    pending += decoder.decode(b"", final=True)
+                    if pending.strip() and not _PROGRESS_LINE_RE.match(pending):
+                        self.ui(self.log_line, pending.rstrip("\r"))
 
-                code = p.wait()
+                    if self.cancel_requested.is_set():
+                        try:
+                            if p.poll() is None:
+                                p.terminate()
+                                try:
+                                    p.wait(timeout=2)
+                                except subprocess.TimeoutExpired:
+                                    p.kill()
+                        except Exception:
+                            pass
+                        raise RuntimeError("Cancelled.")
+
+                    return p.wait(), speed
+
+                hw = False
+                # same hvc1 tag the re-encode path writes, whatever the source container used
+                copy_tag_args = ["-tag:v", "hvc1"] if COPY_VIDEO_CODECS.get(vcodec) == "hevc" else []
+                copy_ok = (n == 1 or tdur == 0) and concat_copy_compatible(infos, vcodec, fps=fps, width=1920, height=1080)
+                if copy_ok and n == 1:
+                    # one clip already in the target format (upright, no rotation matrix, see
+                    # concat_copy_compatible): nothing to stitch or re-encode
+                    self.ui(self.log_line, f"Single clip already upright 1920x1080 @ {fps} fps, "
+                                           f"{COPY_VIDEO_CODECS[vcodec]}/aac: stream copy (no re-encode)")
+                    self.ui(self.log_line, f"  {vcodec} quality/preset and audio bitrate are not applied")
+                    cmd = [
+                        FFMPEG, "-y",
+                        "-i", paths[0],
+                        "-map", "0:v:0",
+                        "-map", "0:a:0",
+                        "-c", "copy",
+                        *copy_tag_args,
+                        "-movflags", "+faststart",
+                        "-progress", "pipe:1",
+                        "-nostats",
+                        out_path
+                    ]
+                elif copy_ok:
+                    # hard cuts between identical streams: remux, don't re-encode
+                    self.ui(self.log_line, f"Hard cuts + matching {COPY_VIDEO_CODECS[vcodec]}/aac clips: "
+                                           "concat demuxer, stream copy (no re-encode)")
+                    list_file = write_concat_list(paths)
+                    cmd = [
+                        FFMPEG, "-y",
+                        "-f", "concat",
+                        "-safe", "0",
+                        "-i", list_file,
+                        "-c", "copy",
+                        *copy_tag_args,
+                        "-movflags", "+faststart",
+                        "-progress", "pipe:1",
+                        "-nostats",
+                        out_path
+                    ]
+                else:
+                    self.ui(self.set_status_text, "Building ffmpeg graph…")
+                    if hw_wanted:
+                        if not cuda_filters_available():
+                            why = "no (CUDA filters missing in ffmpeg)"
+                        elif any(_rotation(_first_stream(info, "video") or {}) % 360 for info in infos):
+                            why = "no (a clip is rotated; CUDA frames aren't autorotated)"
+                        elif not all(nvdec_decodable(info) for info in infos):
+                            why = "no (a clip's codec/pixel format can't be decoded by NVDEC)"
+                        else:
+                            hw = True
+                            why = "yes"
+                        self.ui(self.log_line, f"GPU decode + scaling: {why}")
+                    cmd = graph_cmd(hw)
+
+                code, speed = run_ffmpeg(cmd)
+                if code != 0 and hw:
+                    # a clip the NVDEC checks let through can still break the CUDA graph
+                    self.ui(self.log_line, "")
+                    self.ui(self.log_line, f"GPU path failed (exit code {code}), retrying with CPU decode + scaling")
+                    self.ui(self.set_progress, 0.0, self.total_out_seconds, "")
+                    cmd = graph_cmd(False)
+                    code, speed = run_ffmpeg(cmd)
                 if code != 0:
                     raise RuntimeError(f"ffmpeg failed with exit code {code}")
 
                 self.ui(self.set_progress, self.total_out_seconds, self.total_out_seconds, speed)
                 self.ui(self.set_status_text, "Done.")
+                save_probe_cache(self._probe_cache)
                 self.ui(self.log_line, "")
                 self.ui(self.log_line, f"SUCCESS: {out_path}")
                 self.ui(messagebox.showinfo, "Done", f"Export finished:\n{out_path}")
@@ -1181,6 +1956,11 @@ class App(tk.Tk):
                     self.ui(messagebox.showerror, "Error", msg)
             finally:
                 self.proc = None
+                if list_file:
+                    try:
+                        os.remove(list_file)
+                    except OSError:
+                        pass
                 self.ui(self.set_busy_state, False)
 
         threading.Thread(target=worker, daemon=True).start()